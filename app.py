@@ -1,17 +1,17 @@
 import os
+import re
 import pandas as pd
 import numpy as np
 import json
 import logging
-import requests
 from flask_migrate import Migrate
-from flask import Flask, request, render_template, redirect, url_for, session, flash
+from flask import Flask, request, render_template, redirect, url_for, session, flash, abort, make_response, jsonify
 from werkzeug.security import generate_password_hash, check_password_hash
-from models import db, User, Review, SearchHistory, RecommendationHistory
+from models import db, User, Review, SearchHistory, RecommendationHistory, SentimentSummary, claim_legacy_reviews
 from services.movie_engine import MovieEngine
 from services.tmdb_service import TMDBService
 from services.sentiment_service import SentimentService
-from bs4 import BeautifulSoup
+from services.page_service import MoviePageService
 from dotenv import load_dotenv
 
 
@@ -28,6 +28,9 @@ if not database_url:
 database_url = database_url.replace("postgres://", "postgresql://", 1)
 app.config['SQLALCHEMY_DATABASE_URI'] = database_url
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+REVIEWS_PER_PAGE = 20
+IMDB_ID_PATTERN = re.compile(r"tt\d+")
+MAX_REVIEWS_PER_PAGE = 100
 
 db.init_app(app)
 migrate = Migrate(app, db)
@@ -91,132 +94,81 @@ def home():
     suggestions = MovieEngine.get_suggestions()
     return render_template("home.html", suggestions=suggestions)
 
+def record_history(movie, rec):
+    if 'user_id' not in session:
+        return
+    user_id = session['user_id']
+    db.session.add(SearchHistory(user_id=user_id, search_term=movie))
+    if isinstance(rec, list):
+        db.session.add(RecommendationHistory(user_id=user_id, searched_movie=movie, recommended_movies=",".join(rec)))
+    db.session.commit()
+
 @app.route("/similarity", methods=["POST"])
 def similarity():
     movie = request.form["name"]
-    
-    if 'user_id' in session:
-        user_id = session['user_id']
-        new_search = SearchHistory(user_id=user_id, search_term=movie)
-        db.session.add(new_search)
-        db.session.commit()
-
     rec = MovieEngine.recommend_movies(movie)
-    
-    if 'user_id' in session and isinstance(rec, list):
-        user_id = session['user_id']
-        rec_str = ",".join(rec)
-        new_rec = RecommendationHistory(user_id=user_id, searched_movie=movie, recommended_movies=rec_str)
-        db.session.add(new_rec)
-        db.session.commit()
+    record_history(movie, rec)
 
     if isinstance(rec, str):
         return rec
     else:
         return "---".join(rec)
 
-@app.route("/recommend", methods=["POST"])
-def recommend():
-    try:
-        # Get data from AJAX request
-        title = request.form['title']
-        cast_ids = request.form['cast_ids']
-        cast_names = request.form['cast_names']
-        cast_chars = request.form['cast_chars']
-        cast_bdays = request.form['cast_bdays']
-        cast_bios = request.form['cast_bios']
-        cast_places = request.form['cast_places']
-        cast_profiles = request.form['cast_profiles']
-        imdb_id = request.form['imdb_id']
-        poster = request.form['poster']
-        genres = request.form['genres']
-        overview = request.form['overview']
-        vote_average = request.form['rating']
-        vote_count = request.form['vote_count']
-        release_date = request.form['release_date']
-        runtime = request.form['runtime']
-        status = request.form['status']
-        rec_movies = request.form['rec_movies']
-        rec_posters = request.form['rec_posters']
-
-        # Convert lists
-        rec_movies = MovieEngine.convert_to_list(rec_movies)
-        rec_posters = MovieEngine.convert_to_list(rec_posters)
-        cast_names = MovieEngine.convert_to_list(cast_names)
-        cast_chars = MovieEngine.convert_to_list(cast_chars)
-        cast_profiles = MovieEngine.convert_to_list(cast_profiles)
-        cast_bdays = MovieEngine.convert_to_list(cast_bdays)
-        cast_bios = MovieEngine.convert_to_list(cast_bios)
-        cast_places = MovieEngine.convert_to_list(cast_places)
-
-        # Process cast IDs
-        cast_ids = cast_ids.split(',')
-        cast_ids[0] = cast_ids[0].replace("[","")
-        cast_ids[-1] = cast_ids[-1].replace("]","")
-
-        # Clean bios
-        for i in range(len(cast_bios)):
-            cast_bios[i] = cast_bios[i].replace(r'\n', '\n').replace(r'\"', '\"')
-
-        # Create dictionaries
-        movie_cards = {rec_posters[i]: rec_movies[i] for i in range(len(rec_posters))}
-        casts = {name: [cid, char, profile] for name, cid, char, profile in zip(cast_names, cast_ids, cast_chars, cast_profiles)}
-        cast_details = {name: [cid, profile, bday, place, bio] for name, cid, profile, bday, place, bio in zip(cast_names, cast_ids, cast_profiles, cast_bdays, cast_places, cast_bios)}
-
-        # Get trailer
-        trailer_key = MovieEngine.get_trailer(imdb_id)
-        
-        # Get reviews
-        db_reviews = Review.query.filter(Review.movie_title.ilike(title)).all()
-        reviews_list = []
-        reviews_status = []
-        
-        for rev in db_reviews:
-            reviews_list.append(rev.content)
-            reviews_status.append(rev.sentiment)
-
-        # Scrape IMDB reviews
-        url = f'https://www.imdb.com/title/{imdb_id}/reviews/?ref_=tt_ov_rt'
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-            'Accept-Language': 'en-US,en;q=0.9'
-        }
-    
-        try:
-            response = requests.get(url, headers=headers)
-            logging.info(f"IMDB response status: {response.status_code}")
-            if response.status_code == 200:
-                soup = BeautifulSoup(response.content, 'lxml')
-                soup_result = soup.find_all("div", {"class": "ipc-html-content-inner-div"})
-                
-                for review in soup_result:
-                    try:
-                        content = review.get_text(strip=True)
-                        if not content:
-                            continue
-                        reviews_list.append(content)
-                        # Use SentimentService
-                        sentiment = SentimentService.predict(content)
-                        reviews_status.append(sentiment)
-                    except Exception as e:
-                        logging.info(f"Skipping review: {e}")
-        except Exception as e:
-            logging.info(f"IMDB Scraping Error: {e}")
-
-        # Create reviews dictionary
-        movie_reviews = {reviews_list[i]: reviews_status[i] for i in range(len(reviews_list))}
-        user_logged_in = 'user_id' in session
-        
-        return render_template('recommender.html',
-            title=title, poster=poster, overview=overview, vote_average=vote_average,
-            vote_count=vote_count, release_date=release_date, runtime=runtime,
-            status=status, genres=genres, movie_cards=movie_cards, reviews=movie_reviews,
-            casts=casts, cast_details=cast_details, user_logged_in=user_logged_in,
-            trailer_key=trailer_key, imdb_id=imdb_id)
-                
-    except Exception as e:
-        logging.exception("Error in /recommend route")
-        return str(e), 500
+def movie_reviews_query(imdb_id):
+    # Same set of reviews as SentimentSummary: everything stored under this imdb_id
+    return Review.query.filter(Review.imdb_id == imdb_id).order_by(Review.timestamp.desc(), Review.id.desc())
+
+def get_sentiment_summary(imdb_id):
+    summary = db.session.get(SentimentSummary, imdb_id)
+    if summary is None:
+        summary = SentimentSummary(imdb_id=imdb_id, review_count=0, positive_count=0,
+                                   negative_count=0, confidence_sum=0.0, confidence_count=0)
+    return summary
+
+def render_movie_page(page):
+    imdb_id = page['imdb_id']
+
+    # Get one page of stored user reviews plus the cached IMDB reviews on the first page
+    review_page = request.args.get('review_page', 1, type=int)
+    reviews_pagination = movie_reviews_query(imdb_id).paginate(
+        page=review_page, per_page=REVIEWS_PER_PAGE, error_out=False)
+    movie_reviews = {rev.content: rev.sentiment for rev in reviews_pagination.items}
+    if reviews_pagination.page == 1:
+        movie_reviews.update(page['imdb_reviews'])
+    sentiment_summary = get_sentiment_summary(imdb_id)
+    user_logged_in = 'user_id' in session
+
+    response = make_response(render_template('recommender.html',
+        title=page['title'], poster=page['poster'], overview=page['overview'],
+        vote_average=page['vote_average'], vote_count=page['vote_count'],
+        release_date=page['release_date'], runtime=page['runtime'], status=page['status'],
+        genres=page['genres'], movie_cards=page['movie_cards'], reviews=movie_reviews,
+        casts=page['casts'], cast_details=page['cast_details'], user_logged_in=user_logged_in,
+        trailer_key=page['trailer_key'], imdb_id=imdb_id,
+        sentiment_summary=sentiment_summary, reviews_pagination=reviews_pagination))
+    # Reviews and the summary change on /add_review, so revalidate on every view
+    response.headers['Cache-Control'] = 'private, no-cache'
+    response.add_etag()
+    return response.make_conditional(request)
+
+@app.route("/movie/<imdb_id>", methods=["GET"])
+def movie_page(imdb_id):
+    # Reject junk ids before they reach TMDB, IMDB and the page cache
+    if not IMDB_ID_PATTERN.fullmatch(imdb_id):
+        abort(404)
+    page = MoviePageService.get_page(imdb_id)
+    if page is None:
+        abort(404)
+    return render_movie_page(page)
+
+@app.route("/movie/tmdb/<int:tmdb_id>", methods=["GET"])
+def movie_page_by_tmdb_id(tmdb_id):
+    # Entry point for the search box: the TMDB search result only carries the TMDB id
+    page = MoviePageService.get_page_by_tmdb_id(tmdb_id)
+    if page is None:
+        abort(404)
+    record_history(page['title'], page['recommendations'])
+    return render_movie_page(page)
 
 @app.route("/add_review", methods=["POST"])
 def add_review():
@@ -228,15 +180,16 @@ def add_review():
     content = request.form['review_content']
     imdb_id = request.form.get('imdb_id')
     
-    # Use SentimentService
-    sentiment = SentimentService.predict(content)
+    # Use SentimentService; the sentiment summary is updated when the review is inserted
+    sentiment, confidence = SentimentService.predict_with_confidence(content)
     
     new_review = Review(
         user_id=user_id, 
         movie_title=movie_title, 
-        imdb_id=imdb_id, 
+        imdb_id=imdb_id or None, 
         content=content, 
-        sentiment=sentiment
+        sentiment=sentiment,
+        confidence=confidence
     )
     db.session.add(new_review)
     db.session.commit()
@@ -244,6 +197,25 @@ def add_review():
     flash("Review added successfully!", 'success')
     return redirect(url_for('home'))
 
+# API Routes for movie sentiment
+@app.route("/api/movie/<imdb_id>/sentiment", methods=["GET"])
+def movie_sentiment_api(imdb_id):
+    return jsonify(get_sentiment_summary(imdb_id).to_dict())
+
+@app.route("/api/movie/<imdb_id>/reviews", methods=["GET"])
+def movie_reviews_api(imdb_id):
+    page = request.args.get('page', 1, type=int)
+    per_page = min(request.args.get('per_page', REVIEWS_PER_PAGE, type=int), MAX_REVIEWS_PER_PAGE)
+    pagination = movie_reviews_query(imdb_id).paginate(page=page, per_page=per_page, error_out=False)
+    return jsonify({
+        'imdb_id': imdb_id,
+        'page': pagination.page,
+        'per_page': pagination.per_page,
+        'total': pagination.total,
+        'pages': pagination.pages,
+        'reviews': [rev.to_dict() for rev in pagination.items],
+    })
+
 # API Routes for TMDB (proxies)
 @app.route("/api/tmdb/search", methods=["GET"])
 def tmdb_search():
@@ -262,9 +234,25 @@ def tmdb_movie_credits(movie_id):
 def tmdb_person_details(person_id):
     return TMDBService.get_person_details(person_id)
 
+@app.cli.command("claim-legacy-reviews")
+def claim_legacy_reviews_command():
+    """Attach reviews stored without an imdb_id to their movie, resolving titles through TMDB."""
+    titles = [title for (title,) in db.session.query(Review.movie_title)
+              .filter(Review.imdb_id.is_(None)).distinct()]
+    claimed = 0
+    for title in titles:
+        # The old page resolved a title to the first TMDB search result, so do the same here
+        results = TMDBService.search_movie(title).get('results') or []
+        imdb_id = TMDBService.get_movie_details(results[0]['id']).get('imdb_id') if results else None
+        if not imdb_id:
+            logging.warning(f"No imdb_id found for legacy reviews titled {title!r}")
+            continue
+        claimed += claim_legacy_reviews(imdb_id, title)
+    logging.info(f"✅ Claimed {claimed} legacy review(s) across {len(titles)} title(s)")
+
 if __name__ == '__main__':
     with app.app_context():
         MovieEngine.get_clf_vectorizer()
-        MovieEngine.get_df_engine()
+        MovieEngine.get_catalog()
     port = int(os.environ.get("PORT", 5000))  
     app.run(host="0.0.0.0", port=port, debug=True)
\ No newline at end of file
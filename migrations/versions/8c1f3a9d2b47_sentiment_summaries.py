@@ -0,0 +1,55 @@
+"""Add review confidence and per-movie sentiment summaries
+
+Revision ID: 8c1f3a9d2b47
+Revises: 5479874111e2
+Create Date: 2026-10-19 18:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8c1f3a9d2b47'
+down_revision = '5479874111e2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('sentiment_summaries',
+    sa.Column('imdb_id', sa.String(length=20), nullable=False),
+    sa.Column('review_count', sa.Integer(), nullable=False),
+    sa.Column('positive_count', sa.Integer(), nullable=False),
+    sa.Column('negative_count', sa.Integer(), nullable=False),
+    sa.Column('confidence_sum', sa.Float(), nullable=False),
+    sa.Column('confidence_count', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('imdb_id')
+    )
+    with op.batch_alter_table('reviews', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('confidence', sa.Float(), nullable=True))
+        batch_op.create_index(batch_op.f('ix_reviews_imdb_id'), ['imdb_id'], unique=False)
+
+    # The old form posted an empty imdb_id; treat those like reviews with none so
+    # they can be claimed by title afterwards with `flask claim-legacy-reviews`
+    op.execute("UPDATE reviews SET imdb_id = NULL WHERE imdb_id = ''")
+
+    # Backfill summaries for reviews stored before this revision
+    op.execute(
+        "INSERT INTO sentiment_summaries "
+        "(imdb_id, review_count, positive_count, negative_count, confidence_sum, confidence_count, updated_at) "
+        "SELECT imdb_id, COUNT(*), "
+        "SUM(CASE WHEN sentiment = 'Good' THEN 1 ELSE 0 END), "
+        "SUM(CASE WHEN sentiment = 'Good' THEN 0 ELSE 1 END), "
+        "0, 0, CURRENT_TIMESTAMP "
+        "FROM reviews WHERE imdb_id IS NOT NULL GROUP BY imdb_id"
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('reviews', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_reviews_imdb_id'))
+        batch_op.drop_column('confidence')
+
+    op.drop_table('sentiment_summaries')
@@ -1,4 +1,6 @@
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event, select, update
+from sqlalchemy.exc import IntegrityError
 from datetime import datetime
 
 db = SQLAlchemy()
@@ -21,11 +23,20 @@ class Review(db.Model):
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     movie_title = db.Column(db.String(200), nullable=False)
     # Storing imdb_id might be useful for exact matching if available, but title is easier for now
-    imdb_id = db.Column(db.String(20), nullable=True) 
+    imdb_id = db.Column(db.String(20), nullable=True, index=True)
     content = db.Column(db.Text, nullable=False)
     sentiment = db.Column(db.String(20), nullable=False) # 'Good' or 'Bad'
+    confidence = db.Column(db.Float, nullable=True) # classifier probability of the predicted label
     timestamp = db.Column(db.DateTime, default=datetime.utcnow)
 
+    def to_dict(self):
+        return {
+            'content': self.content,
+            'sentiment': self.sentiment,
+            'confidence': self.confidence,
+            'timestamp': self.timestamp.isoformat() if self.timestamp else None,
+        }
+
 class SearchHistory(db.Model):
     __tablename__ = 'search_history'
     id = db.Column(db.Integer, primary_key=True)
@@ -41,3 +52,122 @@ class RecommendationHistory(db.Model):
     # Storing recommended movies as a simple text string (comma separated) for simplicity
     recommended_movies = db.Column(db.Text, nullable=False) 
     timestamp = db.Column(db.DateTime, default=datetime.utcnow)
+
+class SentimentSummary(db.Model):
+    __tablename__ = 'sentiment_summaries'
+    # Per-movie aggregates, kept up to date by the Review after_insert listener below
+    imdb_id = db.Column(db.String(20), primary_key=True)
+    review_count = db.Column(db.Integer, nullable=False, default=0)
+    positive_count = db.Column(db.Integer, nullable=False, default=0)
+    negative_count = db.Column(db.Integer, nullable=False, default=0)
+    confidence_sum = db.Column(db.Float, nullable=False, default=0.0)
+    confidence_count = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    @property
+    def positive_ratio(self):
+        return self.positive_count / self.review_count if self.review_count else None
+
+    @property
+    def mean_confidence(self):
+        return self.confidence_sum / self.confidence_count if self.confidence_count else None
+
+    def to_dict(self):
+        return {
+            'imdb_id': self.imdb_id,
+            'review_count': self.review_count,
+            'positive_count': self.positive_count,
+            'negative_count': self.negative_count,
+            'positive_ratio': self.positive_ratio,
+            'mean_confidence': self.mean_confidence,
+        }
+
+def increment_sentiment_summary(connection, imdb_id, reviews):
+    """Atomically add ``reviews`` (sentiment, confidence) pairs to a movie's summary row.
+
+    Uses INSERT ... ON CONFLICT DO UPDATE on PostgreSQL and SQLite, so
+    concurrent first reviews for the same movie cannot race into a
+    primary-key violation. Other backends lock the row with SELECT ... FOR
+    UPDATE and update it, or insert it inside a savepoint and fall back to
+    the update if a concurrent insert won.
+    """
+    if not imdb_id or not reviews:
+        return
+    positive = sum(1 for sentiment, _ in reviews if sentiment == 'Good')
+    confidences = [confidence for _, confidence in reviews if confidence is not None]
+    values = {
+        'imdb_id': imdb_id,
+        'review_count': len(reviews),
+        'positive_count': positive,
+        'negative_count': len(reviews) - positive,
+        'confidence_sum': float(sum(confidences)),
+        'confidence_count': len(confidences),
+        'updated_at': datetime.utcnow(),
+    }
+
+    table = SentimentSummary.__table__
+    counters = ('review_count', 'positive_count', 'negative_count', 'confidence_sum', 'confidence_count')
+    if connection.dialect.name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    elif connection.dialect.name == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        _increment_sentiment_summary_locked(connection, table, counters, values)
+        return
+
+    statement = insert(table).values(**values)
+    connection.execute(statement.on_conflict_do_update(
+        index_elements=[table.c.imdb_id],
+        set_={
+            **{name: table.c[name] + statement.excluded[name] for name in counters},
+            'updated_at': statement.excluded.updated_at,
+        },
+    ))
+
+def _increment_sentiment_summary_locked(connection, table, counters, values):
+    increment = (
+        table.update()
+        .where(table.c.imdb_id == values['imdb_id'])
+        .values(**{name: table.c[name] + values[name] for name in counters}, updated_at=values['updated_at'])
+    )
+    existing = connection.execute(
+        select(table.c.imdb_id).where(table.c.imdb_id == values['imdb_id']).with_for_update()
+    ).first()
+    if existing is not None:
+        connection.execute(increment)
+        return
+    try:
+        with connection.begin_nested():
+            connection.execute(table.insert().values(**values))
+    except IntegrityError:
+        connection.execute(increment)
+
+@event.listens_for(Review, 'after_insert')
+def update_sentiment_summary(mapper, connection, review):
+    """Fold a newly stored review into its movie's summary row in the same transaction."""
+    increment_sentiment_summary(connection, review.imdb_id, [(review.sentiment, review.confidence)])
+
+def _escape_like(value):
+    return value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+def claim_legacy_reviews(imdb_id, title):
+    """Attach reviews stored without an imdb_id under ``title`` to this movie and count them.
+
+    Reviews from before imdb_id was recorded can only be matched by title
+    (case-insensitive, wildcards escaped). The matching rows are locked before
+    they are updated so each one is claimed and counted exactly once. Run via
+    ``flask claim-legacy-reviews``, not per page view.
+    """
+    claimed = db.session.execute(
+        select(Review.id, Review.sentiment, Review.confidence)
+        .where(Review.imdb_id.is_(None), Review.movie_title.ilike(_escape_like(title), escape='\\'))
+        .with_for_update()
+    ).all()
+    if claimed:
+        db.session.execute(
+            update(Review).where(Review.id.in_([row.id for row in claimed])).values(imdb_id=imdb_id)
+        )
+        increment_sentiment_summary(db.session.connection(), imdb_id,
+                                    [(row.sentiment, row.confidence) for row in claimed])
+    db.session.commit()
+    return len(claimed)
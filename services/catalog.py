@@ -0,0 +1,296 @@
+import numpy as np
+import faiss
+import hashlib
+import argparse
+import os
+import sys
+import logging
+
+logging.basicConfig(level=logging.INFO)
+
+
+class MovieCatalog:
+    """Compact serving catalog.
+
+    Titles live in one contiguous UTF-8 buffer addressed by an offsets array,
+    and the embedding matrix is stored as float16 or as int8 with one scale
+    factor per row. At serve time the matrix is handed over to a FAISS
+    scalar-quantized index of the same precision, which is searched directly,
+    so no float32 copy and nothing from pandas stays resident. Titles are
+    looked up through a sorted array of 64-bit title hashes rather than a
+    dict of Python strings.
+    """
+    DTYPES = ("float16", "int8")
+    FAISS_QUANTIZERS = {
+        "float16": faiss.ScalarQuantizer.QT_fp16,
+        "int8": faiss.ScalarQuantizer.QT_8bit,
+    }
+    # recall@10 against float32 a catalog must reach before it is saved; int8
+    # halves the index again at the cost of a couple of points of recall
+    MIN_RECALL = {"float16": 0.99, "int8": 0.97}
+    BATCH_SIZE = 65536
+
+    def __init__(self, title_buffer, title_offsets, embeddings=None, scales=None):
+        self.title_buffer = title_buffer
+        self.title_offsets = title_offsets
+        self.embeddings = embeddings
+        self.scales = scales
+        self.dtype = None if embeddings is None else str(embeddings.dtype)
+        self.index = None
+        self.title_hashes = None
+        self.title_rows = None
+
+    @classmethod
+    def from_frame(cls, df, embeddings, dtype="float16"):
+        """Build a catalog from the pickled DataFrame and a float32 matrix."""
+        if dtype not in cls.DTYPES:
+            raise ValueError(f"Unsupported catalog dtype: {dtype}")
+
+        encoded = [str(t).encode("utf-8") for t in df["movie_title"]]
+        title_offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(t) for t in encoded], out=title_offsets[1:])
+        title_buffer = np.frombuffer(b"".join(encoded), dtype=np.uint8).copy()
+
+        embeddings, scales = cls._quantize(embeddings, dtype)
+        return cls(title_buffer, title_offsets, embeddings, scales)
+
+    @classmethod
+    def _quantize(cls, embeddings, dtype, scratch_dir=None):
+        """Quantize in row batches so memmapped float32 input is never fully materialised.
+
+        With ``scratch_dir`` the output is written to ``.npy`` memmaps there
+        instead of being allocated in memory.
+        """
+        quantized_dtype = np.float16 if dtype == "float16" else np.int8
+        if scratch_dir is None:
+            quantized = np.empty(embeddings.shape, dtype=quantized_dtype)
+            scales = None if dtype == "float16" else np.empty(len(embeddings), dtype=np.float32)
+        else:
+            quantized = np.lib.format.open_memmap(
+                os.path.join(scratch_dir, "catalog_embeddings.npy"),
+                mode="w+", dtype=quantized_dtype, shape=embeddings.shape,
+            )
+            scales = None if dtype == "float16" else np.lib.format.open_memmap(
+                os.path.join(scratch_dir, "catalog_scales.npy"),
+                mode="w+", dtype=np.float32, shape=(len(embeddings),),
+            )
+        for start in range(0, len(embeddings), cls.BATCH_SIZE):
+            end = start + cls.BATCH_SIZE
+            batch = np.asarray(embeddings[start:end], dtype=np.float32)
+            if scales is None:
+                quantized[start:end] = batch
+                continue
+            batch_scales = np.abs(batch).max(axis=1) / 127.0
+            batch_scales[batch_scales == 0] = 1.0
+            quantized[start:end] = np.round(batch / batch_scales[:, None]).clip(-127, 127)
+            scales[start:end] = batch_scales
+        return quantized, scales
+
+    @classmethod
+    def from_faiss(cls, df, faiss_index, dtype="float16"):
+        """Build a catalog from the DataFrame and the vectors stored in a flat FAISS index."""
+        embeddings = faiss_index.reconstruct_n(0, faiss_index.ntotal)
+        return cls.from_frame(df, embeddings, dtype=dtype)
+
+    @classmethod
+    def from_ingestion(cls, output_dir, dtype="float16"):
+        """Build a catalog from a StreamingIngestor output directory.
+
+        Every array is memmapped: titles and offsets are already in catalog
+        layout, and ``embeddings.npy`` is quantized batch by batch into scratch
+        ``catalog_*.npy`` files in the same directory, so building and saving
+        the catalog needs only batch-sized memory.
+        """
+        if dtype not in cls.DTYPES:
+            raise ValueError(f"Unsupported catalog dtype: {dtype}")
+        title_buffer = np.memmap(os.path.join(output_dir, "titles.bin"), dtype=np.uint8, mode="r")
+        title_offsets = np.memmap(os.path.join(output_dir, "title_offsets.bin"), dtype=np.int64, mode="r")
+        embeddings = np.load(os.path.join(output_dir, "embeddings.npy"), mmap_mode="r")
+        if len(title_offsets) != len(embeddings) + 1:
+            raise ValueError(f"{output_dir}: {len(title_offsets) - 1} titles but {len(embeddings)} embeddings")
+        quantized, scales = cls._quantize(embeddings, dtype, scratch_dir=output_dir)
+        return cls(title_buffer, title_offsets, quantized, scales)
+
+    @classmethod
+    def load(cls, path, vectors=True):
+        """Load a saved catalog; with ``vectors=False`` only titles are read."""
+        with np.load(path) as data:
+            catalog = cls(data["title_buffer"], data["title_offsets"])
+        if vectors:
+            catalog.load_vectors(path)
+        return catalog
+
+    def load_vectors(self, path):
+        with np.load(path) as data:
+            self.embeddings = data["embeddings"]
+            self.scales = data["scales"] if "scales" in data.files else None
+        self.dtype = str(self.embeddings.dtype)
+
+    def save(self, path):
+        arrays = {
+            "title_buffer": self.title_buffer,
+            "title_offsets": self.title_offsets,
+            "embeddings": self.embeddings,
+        }
+        if self.scales is not None:
+            arrays["scales"] = self.scales
+        # Write next to the target and rename so concurrent readers never see a partial file
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(f, **arrays)
+        os.replace(tmp_path, path)
+
+    def __len__(self):
+        return len(self.title_offsets) - 1
+
+    def title(self, row_id):
+        start, end = self.title_offsets[row_id], self.title_offsets[row_id + 1]
+        return self.title_buffer[start:end].tobytes().decode("utf-8")
+
+    def titles(self):
+        return [self.title(i) for i in range(len(self))]
+
+    @staticmethod
+    def _title_hash(clean_title):
+        return int.from_bytes(hashlib.blake2b(clean_title.encode("utf-8"), digest_size=8).digest(), "little")
+
+    def _build_lookup(self):
+        hashes = np.fromiter(
+            (self._title_hash(self.title(i).strip().lower()) for i in range(len(self))),
+            dtype=np.uint64, count=len(self),
+        )
+        self.title_rows = np.argsort(hashes, kind="stable")
+        self.title_hashes = hashes[self.title_rows]
+
+    def lookup(self, movie_title):
+        """Return the row id for a title, or None if it is not in the catalog.
+
+        Duplicate titles resolve to the last row, as the old DataFrame lookup did.
+        """
+        if self.title_hashes is None:
+            self._build_lookup()
+        clean = movie_title.strip().lower()
+        target = np.uint64(self._title_hash(clean))
+        start = np.searchsorted(self.title_hashes, target, side="left")
+        end = np.searchsorted(self.title_hashes, target, side="right")
+        # Confirm against the stored title in case of a hash collision
+        matches = [int(row) for row in self.title_rows[start:end] if self.title(row).strip().lower() == clean]
+        return matches[-1] if matches else None
+
+    def _dequantize(self, row_ids):
+        rows = self.embeddings[row_ids].astype(np.float32)
+        if self.scales is not None:
+            rows *= self.scales[row_ids][:, None]
+        faiss.normalize_L2(rows)
+        return rows
+
+    def vectors(self, row_ids):
+        """Normalised float32 vectors for the given rows, ready to use as FAISS queries."""
+        row_ids = np.asarray(row_ids, dtype=np.int64)
+        if self.embeddings is None:
+            return np.ascontiguousarray(self.index.reconstruct_batch(row_ids), dtype=np.float32)
+        return np.ascontiguousarray(self._dequantize(row_ids))
+
+    def vector(self, row_id):
+        return self.vectors([row_id])
+
+    def build_index(self, release=False):
+        """Build the scalar-quantized inner-product index searched at serve time.
+
+        With ``release=True`` the raw embedding arrays are dropped afterwards;
+        query vectors are then decoded from the index itself.
+        """
+        dim = self.embeddings.shape[1]
+        index = faiss.IndexScalarQuantizer(dim, self.FAISS_QUANTIZERS[self.dtype], faiss.METRIC_INNER_PRODUCT)
+        if not index.is_trained:
+            sample = np.unique(np.linspace(0, len(self) - 1, min(len(self), self.BATCH_SIZE)).astype(np.int64))
+            index.train(self._dequantize(sample))
+        for start in range(0, len(self), self.BATCH_SIZE):
+            index.add(self._dequantize(np.arange(start, min(start + self.BATCH_SIZE, len(self)))))
+        self.index = index
+        if release:
+            self.embeddings = None
+            self.scales = None
+        return index
+
+    def search(self, query_vectors, k):
+        if self.index is None:
+            self.build_index()
+        return self.index.search(query_vectors, k)
+
+    def lookup_nbytes(self):
+        if self.title_hashes is None:
+            return 0
+        return self.title_hashes.nbytes + self.title_rows.nbytes
+
+    def nbytes(self):
+        """Bytes resident for serving: titles, title lookup and whichever embedding storage is held."""
+        total = self.title_buffer.nbytes + self.title_offsets.nbytes + self.lookup_nbytes()
+        if self.embeddings is not None:
+            total += self.embeddings.nbytes
+        if self.scales is not None:
+            total += self.scales.nbytes
+        if self.index is not None:
+            total += self.index.sa_code_size() * self.index.ntotal
+        return total
+
+    def memory_report(self, df=None, faiss_index=None):
+        """Resident serving footprint, optionally compared with the DataFrame and float32 index."""
+        report = {
+            "rows": len(self),
+            "dtype": self.dtype,
+            "titles_bytes": self.title_buffer.nbytes + self.title_offsets.nbytes,
+            "lookup_bytes": self.lookup_nbytes(),
+            "serving_bytes": self.nbytes(),
+        }
+        if self.index is not None:
+            report["index_bytes"] = self.index.sa_code_size() * self.index.ntotal
+        if df is not None:
+            report["dataframe_bytes"] = int(df.memory_usage(index=True, deep=True).sum())
+        if faiss_index is not None:
+            report["float32_index_bytes"] = faiss_index.ntotal * faiss_index.d * 4
+        baseline = report.get("dataframe_bytes", 0) + report.get("float32_index_bytes", 0)
+        if baseline:
+            report["ratio"] = report["serving_bytes"] / baseline
+        return report
+
+    def recall_at_k(self, faiss_index, k=10, sample=None, seed=0):
+        """Overlap of top-k neighbours from the served quantized index against the float32 index.
+
+        Each side uses its own query vector, exactly as it would be served.
+        """
+        row_ids = np.arange(len(self))
+        if sample is not None and sample < len(row_ids):
+            row_ids = np.random.default_rng(seed).choice(row_ids, size=sample, replace=False)
+
+        reference = faiss_index.reconstruct_batch(row_ids.astype(np.int64)).astype(np.float32)
+        faiss.normalize_L2(reference)
+        _, expected = faiss_index.search(reference, k)
+        _, actual = self.search(self.vectors(row_ids), k)
+        hits = [len(set(e) & set(a)) for e, a in zip(expected, actual)]
+        return float(np.sum(hits)) / (len(row_ids) * k)
+
+    def check_recall(self, faiss_index, k=10, sample=1000, threshold=None):
+        """Raise ValueError if recall@k against float32 falls below ``threshold``."""
+        threshold = self.MIN_RECALL[self.dtype] if threshold is None else threshold
+        recall = self.recall_at_k(faiss_index, k=k, sample=sample)
+        if recall < threshold:
+            raise ValueError(f"recall@{k} of {self.dtype} catalog is {recall:.4f}, below {threshold}")
+        return recall
+
+
+if __name__ == "__main__":
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    sys.path.insert(0, os.path.dirname(current_dir))
+    from services.movie_engine import MovieEngine
+
+    parser = argparse.ArgumentParser(description="Build models/catalog.npz, refusing to save it if recall@10 is too low.")
+    parser.add_argument("dtype", nargs="?", default="float16", choices=MovieCatalog.DTYPES)
+    parser.add_argument("--min-recall", type=float, default=None)
+    args = parser.parse_args()
+
+    catalog, df, faiss_index = MovieEngine.build_catalog(dtype=args.dtype, min_recall=args.min_recall)
+    catalog.build_index(release=True)
+    catalog.lookup("")
+    for key, value in catalog.memory_report(df, faiss_index).items():
+        logging.info(f"{key}: {value}")
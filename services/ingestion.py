@@ -0,0 +1,204 @@
+import pandas as pd
+import numpy as np
+import pickle
+import faiss
+import argparse
+import os
+import time
+import logging
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.decomposition import TruncatedSVD
+from services.catalog import MovieCatalog
+
+logging.basicConfig(level=logging.INFO)
+
+
+class StreamingIngestor:
+    """Chunked ingestion for catalogs that do not fit in memory.
+
+    CSVs in the ``datasets/processed`` layout are read ``chunksize`` rows at a
+    time. Text is vectorized with a stateless HashingVectorizer (or a
+    pre-fitted vectorizer) and projected with a randomized TruncatedSVD fitted
+    on a fixed-size reservoir sample, so peak memory depends on the chunk and
+    sample sizes only. Embeddings are appended to an on-disk memmap and FAISS
+    index shards are flushed every ``shard_size`` rows. A ``catalog.npz`` built
+    from the output is written last so the app can serve it directly.
+    """
+    TEXT_COLUMN = "combined_columns"
+    TITLE_COLUMN = "movie_title"
+
+    def __init__(self, output_dir, n_components=100, n_features=2 ** 16, chunksize=10000,
+                 shard_size=100000, sample_size=50000, vectorizer=None, svd=None, seed=0):
+        self.output_dir = output_dir
+        self.n_components = n_components
+        self.chunksize = chunksize
+        self.shard_size = shard_size
+        self.sample_size = sample_size
+        self.vectorizer = vectorizer or HashingVectorizer(
+            n_features=n_features, alternate_sign=False, norm="l2"
+        )
+        self.svd = svd
+        self.rng = np.random.default_rng(seed)
+        self.stats = {}
+
+    def _validate_headers(self, csv_paths):
+        required = [self.TITLE_COLUMN, self.TEXT_COLUMN]
+        for path in csv_paths:
+            columns = pd.read_csv(path, nrows=0).columns
+            missing = [column for column in required if column not in columns]
+            if missing:
+                raise ValueError(
+                    f"{path} is missing required column(s) {missing}; found {list(columns)}"
+                )
+
+    def _iter_chunks(self, csv_paths, usecols=None):
+        for path in csv_paths:
+            for chunk in pd.read_csv(path, chunksize=self.chunksize, usecols=usecols):
+                yield chunk
+
+    def _texts(self, chunk):
+        return chunk[self.TEXT_COLUMN].fillna("").astype(str).to_numpy(dtype=object)
+
+    def fit(self, csv_paths):
+        """Count rows and, if no projection was given, fit SVD on a reservoir sample."""
+        total_rows = 0
+        sample = np.empty(self.sample_size, dtype=object)
+        for chunk in self._iter_chunks(csv_paths, usecols=[self.TEXT_COLUMN]):
+            texts = self._texts(chunk)
+            if self.svd is None:
+                positions = np.arange(total_rows, total_rows + len(texts))
+                fill = positions < self.sample_size
+                sample[positions[fill]] = texts[fill]
+                slots = self.rng.integers(0, positions[~fill] + 1) if (~fill).any() else positions[:0]
+                keep = slots < self.sample_size
+                sample[slots[keep]] = texts[~fill][keep]
+            total_rows += len(texts)
+
+        if total_rows == 0:
+            raise ValueError("No rows to ingest")
+        if self.svd is None:
+            if total_rows < 2:
+                raise ValueError(f"Need at least 2 rows to fit SVD, got {total_rows}; pass a pre-fitted svd")
+            sample = sample[:min(total_rows, self.sample_size)]
+            n_components = min(self.n_components, len(sample) - 1)
+            self.svd = TruncatedSVD(n_components=n_components, algorithm="randomized", random_state=0)
+            self.svd.fit(self.vectorizer.transform(sample))
+            logging.info(f"✅ SVD fitted on a sample of {len(sample)} rows")
+        return total_rows
+
+    def _flush_shard(self, shard, shard_id):
+        shard_path = os.path.join(self.output_dir, f"faiss_shard_{shard_id:03d}.index")
+        faiss.write_index(shard, shard_path)
+        logging.info(f"Wrote {shard.ntotal} vectors to {shard_path}")
+
+    def _write_catalog(self):
+        """Write ``catalog.npz``; serve it with MOVIE_CATALOG_PATH=<output_dir>/catalog.npz."""
+        catalog = MovieCatalog.from_ingestion(self.output_dir)
+        catalog.save(os.path.join(self.output_dir, "catalog.npz"))
+        del catalog
+        for name in ("catalog_embeddings.npy", "catalog_scales.npy"):
+            path = os.path.join(self.output_dir, name)
+            if os.path.exists(path):
+                os.remove(path)
+
+    def run(self, csv_paths):
+        """Stream every CSV into the memmap, title buffer and FAISS shards."""
+        self._validate_headers(csv_paths)
+        os.makedirs(self.output_dir, exist_ok=True)
+        start = time.perf_counter()
+        total_rows = self.fit(csv_paths)
+        dim = self.svd.components_.shape[0]
+
+        embeddings = np.lib.format.open_memmap(
+            os.path.join(self.output_dir, "embeddings.npy"),
+            mode="w+", dtype=np.float32, shape=(total_rows, dim),
+        )
+        titles_file = open(os.path.join(self.output_dir, "titles.bin"), "wb")
+        offsets_file = open(os.path.join(self.output_dir, "title_offsets.bin"), "wb")
+        offsets_file.write(np.zeros(1, dtype=np.int64).tobytes())
+
+        row = 0
+        title_end = 0
+        shard_id = 0
+        shard = faiss.IndexFlatIP(dim)
+        encode_start = time.perf_counter()
+        try:
+            for chunk in self._iter_chunks(csv_paths, usecols=[self.TITLE_COLUMN, self.TEXT_COLUMN]):
+                vectors = self.svd.transform(self.vectorizer.transform(self._texts(chunk))).astype(np.float32)
+                faiss.normalize_L2(vectors)
+                embeddings[row:row + len(vectors)] = vectors
+
+                encoded = [str(t).encode("utf-8") for t in chunk[self.TITLE_COLUMN].fillna("")]
+                titles_file.write(b"".join(encoded))
+                offsets = title_end + np.cumsum([len(t) for t in encoded], dtype=np.int64)
+                offsets_file.write(offsets.tobytes())
+                if len(offsets):
+                    title_end = int(offsets[-1])
+
+                written = 0
+                while written < len(vectors):
+                    take = min(self.shard_size - shard.ntotal, len(vectors) - written)
+                    shard.add(vectors[written:written + take])
+                    written += take
+                    if shard.ntotal == self.shard_size:
+                        self._flush_shard(shard, shard_id)
+                        shard_id += 1
+                        shard = faiss.IndexFlatIP(dim)
+
+                row += len(vectors)
+                elapsed = time.perf_counter() - encode_start
+                logging.info(f"Ingested {row}/{total_rows} rows ({row / elapsed:.0f} rows/s)")
+
+            if shard.ntotal:
+                self._flush_shard(shard, shard_id)
+                shard_id += 1
+            embeddings.flush()
+        finally:
+            titles_file.close()
+            offsets_file.close()
+            del embeddings
+
+        with open(os.path.join(self.output_dir, "svd.pkl"), "wb") as f:
+            pickle.dump(self.svd, f)
+
+        self._write_catalog()
+
+        encode_elapsed = time.perf_counter() - encode_start
+        elapsed = time.perf_counter() - start
+        self.stats = {
+            "rows": row,
+            "shards": shard_id,
+            "dimensions": dim,
+            "seconds": elapsed,
+            "rows_per_second": row / elapsed if elapsed else float("inf"),
+            "encode_rows_per_second": row / encode_elapsed if encode_elapsed else float("inf"),
+        }
+        logging.info(f"✅ Ingestion finished: {row} rows in {elapsed:.2f}s "
+                     f"({self.stats['rows_per_second']:.0f} rows/s), {shard_id} shard(s)")
+        return self.stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stream processed CSVs into memmapped embeddings and FAISS shards.")
+    parser.add_argument("csv_paths", nargs="+")
+    parser.add_argument("--output-dir", default="models/streaming")
+    parser.add_argument("--chunksize", type=int, default=10000)
+    parser.add_argument("--shard-size", type=int, default=100000)
+    parser.add_argument("--sample-size", type=int, default=50000)
+    parser.add_argument("--n-components", type=int, default=100)
+    parser.add_argument("--vectorizer", help="Pickled pre-fitted vectorizer to use instead of hashing")
+    parser.add_argument("--svd", help="Pickled pre-fitted SVD to skip the sampling fit")
+    args = parser.parse_args()
+
+    vectorizer = svd = None
+    if args.vectorizer:
+        with open(args.vectorizer, "rb") as f:
+            vectorizer = pickle.load(f)
+    if args.svd:
+        with open(args.svd, "rb") as f:
+            svd = pickle.load(f)
+
+    StreamingIngestor(
+        args.output_dir, n_components=args.n_components, chunksize=args.chunksize,
+        shard_size=args.shard_size, sample_size=args.sample_size, vectorizer=vectorizer, svd=svd,
+    ).run(args.csv_paths)
@@ -4,17 +4,24 @@ import pickle
 import faiss
 import requests
 import os
+import time
+import threading
 import logging
 from bs4 import BeautifulSoup
+from services.catalog import MovieCatalog
+from services.search_service import SearchClient
+from multiprocessing import AuthenticationError
 
 logging.basicConfig(level=logging.INFO)
 
 class MovieEngine:
     clf = None
     vectorizer = None
-    df = None
-    svd = None
-    faiss_index = None
+    catalog = None
+    _local_index_lock = threading.Lock()
+    search_client = None
+    search_client_retry_at = 0.0
+    SEARCH_RETRY_SECONDS = 30
 
     @classmethod
     def _get_project_root(cls):
@@ -42,33 +49,94 @@ class MovieEngine:
         return cls.clf, cls.vectorizer
 
     @classmethod
-    def get_df_engine(cls):
-        if cls.df is None:
+    def catalog_path(cls):
+        # MOVIE_CATALOG_PATH points at a catalog written by streaming ingestion instead
+        return os.environ.get("MOVIE_CATALOG_PATH") or os.path.join(cls._get_project_root(), "models", "catalog.npz")
+
+    @classmethod
+    def build_catalog(cls, dtype="float16", min_recall=None):
+        """Build models/catalog.npz from df.pkl and the float32 FAISS index.
+
+        The catalog is only written once its recall@10 against float32 passes
+        MovieCatalog.check_recall, which raises ValueError otherwise. Nothing
+        loaded here is kept on the class, so building does not leave the
+        DataFrame or the float32 index resident in the worker.
+        """
+        project_root = cls._get_project_root()
+        with open(os.path.join(project_root, "models", "df.pkl"), "rb") as f:
+            df = pickle.load(f)
+        faiss_index = faiss.read_index(os.path.join(project_root, "models", "faiss_movies.index"))
+        catalog = MovieCatalog.from_faiss(df, faiss_index, dtype=dtype)
+        recall = catalog.check_recall(faiss_index, k=10, threshold=min_recall)
+        catalog.save(cls.catalog_path())
+        logging.info(f"✅ Catalog Built (recall@10 {recall:.4f}) and saved to {cls.catalog_path()}")
+        return catalog, df, faiss_index
+
+    @classmethod
+    def get_catalog(cls):
+        """Titles and title lookup; vectors and the index are loaded by get_local_catalog."""
+        if cls.catalog is None:
+            catalog_path = cls.catalog_path()
+            if os.path.exists(catalog_path):
+                catalog = MovieCatalog.load(catalog_path, vectors=False)
+            else:
+                # Normally built offline with `python -m services.catalog`; a missing
+                # file falls back to a float16 build, which is saved only if it passes
+                logging.info(f"Catalog not found at {catalog_path}, building it")
+                catalog, _, _ = cls.build_catalog()
+                catalog.build_index(release=True)
+            cls.catalog = catalog
+            logging.info(f"✅ Catalog Loaded Successfully from {catalog_path} ({catalog.nbytes()} bytes resident)")
+        return cls.catalog
+
+    @classmethod
+    def get_local_catalog(cls):
+        """The catalog with its FAISS index, loaded on first local search.
+
+        Workers that reach the search service never get here and hold titles
+        only; the index is loaded when no service is configured or it fails.
+        """
+        catalog = cls.get_catalog()
+        with cls._local_index_lock:
+            if catalog.index is None:
+                catalog.load_vectors(cls.catalog_path())
+                catalog.build_index(release=True)
+                logging.info(f"✅ Local search index loaded ({catalog.nbytes()} bytes resident)")
+        return catalog
+
+    @classmethod
+    def _search_service_failed(cls, message, error):
+        logging.error(f"❌ {message}, using local index for {cls.SEARCH_RETRY_SECONDS}s: {error!r}")
+        cls.search_client = None
+        cls.search_client_retry_at = time.monotonic() + cls.SEARCH_RETRY_SECONDS
+
+    @classmethod
+    def get_search_client(cls):
+        """Client for the standalone search service, if SEARCH_SERVICE_ADDRESS is set."""
+        address = os.environ.get("SEARCH_SERVICE_ADDRESS")
+        if cls.search_client is None and address and time.monotonic() >= cls.search_client_retry_at:
+            authkey = os.environ.get("SEARCH_SERVICE_AUTHKEY")
+            if not authkey:
+                cls._search_service_failed("SEARCH_SERVICE_AUTHKEY is not set", None)
+                return None
             try:
-                project_root = cls._get_project_root()
-                
-                df_path = os.path.join(project_root, "models", "df.pkl")
-                svd_path = os.path.join(project_root, "models", "svd.pkl")
-                faiss_path = os.path.join(project_root, "models", "faiss_movies.index")
-                
-                with open(df_path, "rb") as f:
-                    cls.df = pickle.load(f)
-                cls.df["movie_title_clean"] = cls.df["movie_title"].str.strip().str.lower()
-                if not hasattr(cls, "lookup_dict"):
-                    cls.lookup_dict = dict(zip(cls.df["movie_title_clean"], cls.df.index))
-
-                if cls.svd is None:
-                    with open(svd_path, "rb") as f:
-                        cls.svd = pickle.load(f) 
-                    
-                if cls.faiss_index is None:
-                    cls.faiss_index = faiss.read_index(faiss_path)  
-
-                logging.info(f"✅ FAISS Models Loaded Successfully from {project_root}/models/")
-            except FileNotFoundError as e:
-                logging.error(f"❌ FAISS Models Loading Failed: {e}")
-                raise e
-        return cls.df, cls.svd, cls.faiss_index
+                cls.search_client = SearchClient(address, authkey=authkey)
+                logging.info(f"✅ Connected to search service at {address}")
+            except (OSError, EOFError, AuthenticationError) as e:
+                cls._search_service_failed("Search service unavailable", e)
+        return cls.search_client
+
+    @classmethod
+    def search_rows(cls, row_ids, k):
+        """Top-k neighbours of catalog rows, from the search service when it is up."""
+        search_client = cls.get_search_client()
+        if search_client is not None:
+            try:
+                return search_client.search_rows(row_ids, k)
+            except (OSError, EOFError, AuthenticationError) as e:
+                cls._search_service_failed("Search service failed", e)
+        catalog = cls.get_local_catalog()
+        return catalog.search(catalog.vectors(row_ids), k)
 
     @classmethod
     def get_vectorizer(cls):
@@ -87,46 +155,22 @@ class MovieEngine:
 
     @classmethod
     def recommend_movies(cls, movie_title):
-        df, svd, faiss_index = cls.get_df_engine()
-        vectorizer = cls.get_vectorizer()
+        catalog = cls.get_catalog()
 
-        m_clean = movie_title.strip().lower()
-        lookup_dict = dict(zip(df["movie_title_clean"], df.index))
-        if m_clean not in lookup_dict:
+        i = catalog.lookup(movie_title)
+        if i is None:
             return "Sorry! The movie you requested for is not available."
-        i = lookup_dict[m_clean]
-
-        movies_text = df.loc[i, "combined_columns"]
-        tfidf_vec = vectorizer.transform([movies_text])
-        query_vector = svd.transform(tfidf_vec).astype("float32")
-        faiss.normalize_L2(query_vector)
-        distance, indices = faiss_index.search(query_vector, k=12)
-        neighbor_indices = [idx for idx in indices[0] if idx != i]
-        recommendations = [df["movie_title"].iloc[idx] for idx in neighbor_indices][:10]
+
+        distance, indices = cls.search_rows([i], 12)
+        neighbor_indices = [idx for idx in indices[0] if idx != i and idx != -1]
+        recommendations = [catalog.title(idx) for idx in neighbor_indices][:10]
         return recommendations
 
     
-    @classmethod
-    def convert_to_list(cls, my_list):
-        try:
-            if isinstance(my_list, list):
-                return my_list
-            if not my_list or my_list == "[]":
-                return []
-            my_list = my_list.split('","')
-            if len(my_list) > 0:
-                my_list[0] = my_list[0].replace('["','')
-                my_list[-1] = my_list[-1].replace('"]', '')
-            return my_list
-        except Exception as e:
-            logging.info(f"Error Converting List: {e}")
-            return []
-
-        
     @classmethod
     def get_suggestions(cls):
-        df, _, _ = cls.get_df_engine()
-        return list(df["movie_title"].str.capitalize())
+        catalog = cls.get_catalog()
+        return [title.capitalize() for title in catalog.titles()]
 
 
     @classmethod
@@ -137,13 +181,13 @@ class MovieEngine:
             return None
         try:
             find_url = f"https://api.themoviedb.org/3/find/{imdb_id}?api_key={api_key}&external_source=imdb_id"
-            response = requests.get(find_url)
+            response = requests.get(find_url, timeout=5)
             data = response.json()
             if not data.get("movie_results"):
                 return None
             tmdb_id = data['movie_results'][0]['id']
             video_url = f"https://api.themoviedb.org/3/movie/{tmdb_id}/videos?api_key={api_key}"
-            video_response = requests.get(video_url)
+            video_response = requests.get(video_url, timeout=5)
             video_data = video_response.json()
             results = video_data.get('results', [])
             youtube_videos = [v for v in results if v['site'] == 'YouTube']
@@ -157,9 +201,6 @@ class MovieEngine:
                 return teasers[0]['key']
             return youtube_videos[0]['key']
         except Exception as e:
+            # Raised so callers can tell a failed lookup from a movie without a trailer
             logging.info(f"Error fetching trailer: {e}")
-            return None
-
-
-if __name__ == "__main__":
-    MovieEngine().get_df_engine()
\ No newline at end of file
+            raise
@@ -0,0 +1,199 @@
+import requests
+import time
+import threading
+import logging
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from bs4 import BeautifulSoup
+from services.movie_engine import MovieEngine
+from services.tmdb_service import TMDBService
+from services.sentiment_service import SentimentService
+
+logging.basicConfig(level=logging.INFO)
+
+IMAGE_BASE_URL = "https://image.tmdb.org/t/p/original"
+NO_PROFILE_URL = "https://via.placeholder.com/240x360?text=No+Image"
+NO_POSTER_URL = "https://via.placeholder.com/240x360?text=No+Poster"
+SCRAPE_TIMEOUT = 5
+
+
+class MoviePageService:
+    """Assembles the movie page model on the server, keyed by imdb_id.
+
+    Everything the page needs (TMDB details, cast, recommendation posters,
+    trailer and scraped IMDB reviews) is fetched once per movie and kept in an
+    in-process TTL/LRU cache, so repeated views skip TMDB and the engine
+    entirely. Cold builds fan the per-cast and per-poster TMDB lookups out over
+    a small thread pool; every upstream call has a timeout. A page built while
+    any upstream call failed is marked ``degraded`` and only cached for
+    ``DEGRADED_CACHE_TTL`` so it is rebuilt once the upstream recovers.
+    """
+    CACHE_TTL = 60 * 60
+    DEGRADED_CACHE_TTL = 60
+    CACHE_SIZE = 512
+    FETCH_WORKERS = 8
+    _cache = OrderedDict()
+    _cache_lock = threading.Lock()
+
+    @staticmethod
+    def _format_date(value):
+        try:
+            return datetime.strptime(value, "%Y-%m-%d").strftime("%b %d %Y")
+        except (TypeError, ValueError):
+            return "Unknown"
+
+    @staticmethod
+    def _format_runtime(minutes):
+        minutes = int(minutes or 0)
+        if minutes % 60 == 0:
+            return f"{minutes // 60} hour(s)"
+        return f"{minutes // 60} hour(s) {minutes % 60} min(s)"
+
+    @staticmethod
+    def _failed(response):
+        # TMDBService returns {'error': ...} on exceptions; TMDB's own error bodies carry success: false
+        return 'error' in response or response.get('success') is False
+
+    @classmethod
+    def _get_casts(cls, tmdb_id):
+        """Return casts, cast_details and whether every TMDB call behind them succeeded."""
+        credits = TMDBService.get_movie_credits(tmdb_id)
+        cast = credits.get('cast') or []
+        top_cast = cast[:10] if len(cast) >= 10 else cast[:5]
+
+        with ThreadPoolExecutor(max_workers=cls.FETCH_WORKERS) as pool:
+            people = list(pool.map(lambda member: TMDBService.get_person_details(member['id']), top_cast))
+
+        casts = {}
+        cast_details = {}
+        for member, person in zip(top_cast, people):
+            profile = IMAGE_BASE_URL + member['profile_path'] if member.get('profile_path') else NO_PROFILE_URL
+            casts[member['name']] = [member['id'], member.get('character'), profile]
+            cast_details[member['name']] = [
+                member['id'],
+                profile,
+                cls._format_date(person.get('birthday')),
+                person.get('place_of_birth') or 'Unknown',
+                person.get('biography') or 'No biography available',
+            ]
+        complete = bool(cast) and not cls._failed(credits) and not any(cls._failed(p) for p in people)
+        return casts, cast_details, complete
+
+    @classmethod
+    def _get_movie_cards(cls, rec_movies):
+        """Return poster cards for the recommendations and whether every search succeeded."""
+        with ThreadPoolExecutor(max_workers=cls.FETCH_WORKERS) as pool:
+            searches = list(pool.map(TMDBService.search_movie, rec_movies))
+
+        movie_cards = {}
+        for rec, search in zip(rec_movies, searches):
+            results = search.get('results') or []
+            if results and results[0].get('poster_path'):
+                movie_cards[IMAGE_BASE_URL + results[0]['poster_path']] = rec
+            else:
+                movie_cards.setdefault(NO_POSTER_URL, rec)
+        return movie_cards, not any(cls._failed(search) for search in searches)
+
+    @classmethod
+    def _scrape_imdb_reviews(cls, imdb_id):
+        """Return scraped reviews with their sentiment, or None if IMDB could not be fetched."""
+        url = f'https://www.imdb.com/title/{imdb_id}/reviews/?ref_=tt_ov_rt'
+        headers = {
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+            'Accept-Language': 'en-US,en;q=0.9'
+        }
+        reviews = {}
+        try:
+            response = requests.get(url, headers=headers, timeout=SCRAPE_TIMEOUT)
+            logging.info(f"IMDB response status: {response.status_code}")
+            if response.status_code != 200:
+                return None
+            soup = BeautifulSoup(response.content, 'lxml')
+            for review in soup.find_all("div", {"class": "ipc-html-content-inner-div"}):
+                try:
+                    content = review.get_text(strip=True)
+                    if content:
+                        reviews[content] = SentimentService.predict(content)
+                except Exception as e:
+                    logging.info(f"Skipping review: {e}")
+        except Exception as e:
+            logging.error(f"IMDB Scraping Error: {e}")
+            return None
+        return reviews
+
+    @classmethod
+    def build_page(cls, imdb_id):
+        """Build the page model from TMDB and the engine, or None if TMDB does not know the id.
+
+        ``degraded`` is set when any upstream call failed and the page is
+        missing something it would normally show.
+        """
+        found = TMDBService.find_by_imdb_id(imdb_id).get('movie_results') or []
+        if not found:
+            return None
+        tmdb_id = found[0]['id']
+        title = found[0].get('original_title') or found[0].get('title')
+
+        details = TMDBService.get_movie_details(tmdb_id)
+        casts, cast_details, casts_complete = cls._get_casts(tmdb_id)
+        recommendations = MovieEngine.recommend_movies(title)
+        if isinstance(recommendations, str):
+            recommendations = []
+        movie_cards, cards_complete = cls._get_movie_cards(recommendations)
+        try:
+            trailer_key = MovieEngine.get_trailer(imdb_id)
+            trailer_failed = False
+        except Exception as e:
+            logging.error(f"Trailer lookup failed for {imdb_id}: {e}")
+            trailer_key, trailer_failed = None, True
+        imdb_reviews = cls._scrape_imdb_reviews(imdb_id)
+
+        degraded = (cls._failed(details) or not casts_complete or not cards_complete
+                    or trailer_failed or imdb_reviews is None)
+        return {
+            'title': title,
+            'imdb_id': imdb_id,
+            'poster': IMAGE_BASE_URL + details['poster_path'] if details.get('poster_path') else NO_POSTER_URL,
+            'overview': details.get('overview'),
+            'vote_average': details.get('vote_average'),
+            'vote_count': f"{details.get('vote_count') or 0:,}",
+            'release_date': cls._format_date(details.get('release_date')),
+            'runtime': cls._format_runtime(details.get('runtime')),
+            'status': details.get('status'),
+            'genres': ", ".join(genre['name'] for genre in details.get('genres', [])),
+            'recommendations': recommendations,
+            'movie_cards': movie_cards,
+            'casts': casts,
+            'cast_details': cast_details,
+            'trailer_key': trailer_key,
+            'imdb_reviews': imdb_reviews or {},
+            'degraded': degraded,
+        }
+
+    @classmethod
+    def get_page(cls, imdb_id):
+        now = time.time()
+        with cls._cache_lock:
+            cached = cls._cache.get(imdb_id)
+            if cached and now < cached[0]:
+                cls._cache.move_to_end(imdb_id)
+                return cached[1]
+
+        page = cls.build_page(imdb_id)
+        if page is not None:
+            ttl = cls.DEGRADED_CACHE_TTL if page['degraded'] else cls.CACHE_TTL
+            with cls._cache_lock:
+                cls._cache[imdb_id] = (now + ttl, page)
+                cls._cache.move_to_end(imdb_id)
+                if len(cls._cache) > cls.CACHE_SIZE:
+                    cls._cache.popitem(last=False)
+        return page
+
+    @classmethod
+    def get_page_by_tmdb_id(cls, tmdb_id):
+        """Resolve a TMDB id (what the search box has) to its imdb_id page."""
+        imdb_id = TMDBService.get_movie_details(tmdb_id).get('imdb_id')
+        if not imdb_id:
+            return None
+        return cls.get_page(imdb_id)
@@ -0,0 +1,302 @@
+import numpy as np
+import argparse
+import os
+import sys
+import queue
+import signal
+import threading
+import time
+import logging
+from multiprocessing import AuthenticationError, Pipe, Process, shared_memory
+from multiprocessing.connection import Client, Listener
+
+logging.basicConfig(level=logging.INFO)
+
+DEFAULT_ADDRESS = "127.0.0.1:6060"
+# Every web worker connects at boot; Listener's default backlog of 1 drops those connects
+LISTEN_BACKLOG = 128
+
+
+class ShardFailure(RuntimeError):
+    """A shard process died; the service cannot answer queries any more."""
+
+
+def parse_address(address):
+    """Turn ``host:port`` into a TCP tuple; anything else is a unix socket path."""
+    host, sep, port = address.rpartition(":")
+    if sep and port.isdigit():
+        return host, int(port)
+    return address
+
+
+def _top_k(scores, k):
+    """Row-wise top-k of a (n_queries, n_rows) score matrix, best first."""
+    k = min(k, scores.shape[1])
+    part = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    part_scores = np.take_along_axis(scores, part, axis=1)
+    order = np.argsort(-part_scores, axis=1)
+    return np.take_along_axis(part_scores, order, axis=1), np.take_along_axis(part, order, axis=1)
+
+
+def _shard_worker(shm_name, shape, start, end, conn):
+    """Answer inner-product queries against rows [start, end) of the shared matrix."""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    shard = np.ndarray(shape, dtype=np.float32, buffer=shm.buf)[start:end]
+    while True:
+        message = conn.recv()
+        if message is None:
+            break
+        queries, k = message
+        scores, ids = _top_k(queries @ shard.T, k)
+        conn.send((scores, ids + start))
+    del shard
+    shm.close()
+
+
+class SearchServer:
+    """Standalone vector search over a MovieCatalog.
+
+    The dequantized, normalised embeddings are copied once into a shared
+    memory block. Each shard process maps its own row range of that block, so
+    memory is not duplicated per process. Queries from every client
+    connection are queued and a single dispatcher thread sends them to the
+    shards as one batch every ``batch_window`` seconds at most, then merges
+    the per-shard top-k lists.
+    """
+
+    def __init__(self, catalog, n_shards=None, batch_window=0.002, max_batch=64):
+        self.catalog = catalog
+        self.n_shards = n_shards or os.cpu_count() or 1
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.shm = None
+        self.vectors = None
+        self.shards = []
+        self.pending = queue.Queue()
+        self.failure = None
+
+    def start(self):
+        vectors = self.catalog.vectors(np.arange(len(self.catalog)))
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        vectors /= norms
+
+        self.shm = shared_memory.SharedMemory(create=True, size=vectors.nbytes)
+        self.vectors = np.ndarray(vectors.shape, dtype=np.float32, buffer=self.shm.buf)
+        self.vectors[:] = vectors
+
+        bounds = np.linspace(0, len(vectors), self.n_shards + 1, dtype=int)
+        for start, end in zip(bounds[:-1], bounds[1:]):
+            if start == end:
+                continue
+            parent_conn, child_conn = Pipe()
+            process = Process(
+                target=_shard_worker,
+                args=(self.shm.name, vectors.shape, int(start), int(end), child_conn),
+                daemon=True,
+            )
+            process.start()
+            self.shards.append((process, parent_conn))
+        threading.Thread(target=self._dispatch_loop, daemon=True).start()
+        logging.info(f"✅ Search service started: {len(vectors)} vectors in {len(self.shards)} shard(s)")
+
+    def stop(self):
+        for process, conn in self.shards:
+            try:
+                conn.send(None)
+            except (OSError, EOFError):
+                pass
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        self.shards = []
+        if self.shm is not None:
+            self.vectors = None
+            self.shm.close()
+            self.shm.unlink()
+            self.shm = None
+
+    def _fail(self, message):
+        """Record a shard failure and shut the whole service down so it gets restarted."""
+        if self.failure is None:
+            self.failure = ShardFailure(message)
+            logging.critical(f"❌ {message}; shutting down search service")
+            os.kill(os.getpid(), signal.SIGTERM)
+        raise self.failure
+
+    def _check_shards(self):
+        for n, (process, _) in enumerate(self.shards):
+            if not process.is_alive():
+                self._fail(f"Shard {n} (pid {process.pid}) exited with code {process.exitcode}")
+
+    def _watch_shards(self, interval=1.0):
+        while self.failure is None:
+            try:
+                self._check_shards()
+            except ShardFailure:
+                return
+            time.sleep(interval)
+
+    def _search_shards(self, queries, k):
+        """Scatter one batch to every shard and merge the results; dispatcher thread only."""
+        if self.failure is not None:
+            raise self.failure
+        self._check_shards()
+        try:
+            for _, conn in self.shards:
+                conn.send((queries, k))
+            results = [conn.recv() for _, conn in self.shards]
+        except (OSError, EOFError) as e:
+            self._fail(f"Lost connection to a shard process: {e!r}")
+        scores = np.hstack([r[0] for r in results])
+        ids = np.hstack([r[1] for r in results])
+        top_scores, order = _top_k(scores, k)
+        return top_scores, np.take_along_axis(ids, order, axis=1)
+
+    def _dispatch_loop(self):
+        while True:
+            batch = [self.pending.get()]
+            try:
+                while len(batch) < self.max_batch:
+                    batch.append(self.pending.get(timeout=self.batch_window))
+            except queue.Empty:
+                pass
+
+            k = max(item["k"] for item in batch)
+            try:
+                scores, ids = self._search_shards(np.vstack([item["queries"] for item in batch]), k)
+                row = 0
+                for item in batch:
+                    end = row + len(item["queries"])
+                    item["result"] = (scores[row:end, :item["k"]], ids[row:end, :item["k"]])
+                    row = end
+            except Exception as e:
+                for item in batch:
+                    item["error"] = e
+            for item in batch:
+                item["done"].set()
+
+    def search(self, queries, k):
+        """Queue queries for the next batch and wait for their top-k, best first."""
+        if self.failure is not None:
+            raise self.failure
+        queries = np.ascontiguousarray(queries, dtype=np.float32)
+        if queries.ndim != 2 or queries.shape[1] != self.vectors.shape[1] or int(k) < 1:
+            raise ValueError(f"Expected (n, {self.vectors.shape[1]}) queries and k >= 1, got {queries.shape} and {k}")
+        item = {"queries": queries, "k": int(k), "done": threading.Event()}
+        self.pending.put(item)
+        item["done"].wait()
+        if "error" in item:
+            raise item["error"]
+        return item["result"]
+
+    def search_rows(self, row_ids, k):
+        """Search with catalog rows as queries, so clients need no vectors of their own."""
+        row_ids = np.asarray(row_ids, dtype=np.int64)
+        if row_ids.ndim != 1 or ((row_ids < 0) | (row_ids >= len(self.vectors))).any():
+            raise ValueError(f"Row ids out of range for {len(self.vectors)} rows")
+        return self.search(self.vectors[row_ids], k)
+
+    def _handle(self, conn):
+        requests = {"vectors": self.search, "rows": self.search_rows}
+        try:
+            while True:
+                kind, payload, k = conn.recv()
+                conn.send(requests[kind](payload, k))
+        except (EOFError, ConnectionError):
+            pass
+        except ShardFailure:
+            # Closing the connection makes the client fall back to its local index
+            pass
+        except (KeyError, TypeError, ValueError) as e:
+            logging.warning(f"Closing search service connection after a bad request: {e!r}")
+        finally:
+            conn.close()
+
+    def serve_forever(self, address, authkey):
+        if not authkey:
+            raise ValueError("An authkey is required: connections unpickle whatever they receive")
+
+        def _terminate(signum, frame):
+            raise SystemExit(1 if self.failure else 0)
+        signal.signal(signal.SIGTERM, _terminate)
+
+        self.start()
+        threading.Thread(target=self._watch_shards, daemon=True).start()
+        try:
+            with Listener(parse_address(address), backlog=LISTEN_BACKLOG, authkey=authkey.encode()) as listener:
+                logging.info(f"✅ Search service listening on {address}")
+                while True:
+                    try:
+                        conn = listener.accept()
+                    except (OSError, EOFError, AuthenticationError) as e:
+                        logging.warning(f"Rejected search service connection: {e!r}")
+                        continue
+                    threading.Thread(target=self._handle, args=(conn,), daemon=True).start()
+        finally:
+            self.stop()
+
+
+class SearchClient:
+    """Client used by the Flask app.
+
+    Each call is one request/reply on a shared connection; batching across
+    workers happens in the service. A reply that takes longer than
+    ``timeout`` seconds breaks the client; every later call then raises
+    immediately so the caller can fall back.
+    """
+
+    def __init__(self, address, authkey, timeout=2.0):
+        self.conn = Client(parse_address(address), authkey=authkey.encode())
+        self.timeout = timeout
+        self.broken = None
+        self.lock = threading.Lock()
+
+    def _break(self, error):
+        self.broken = error
+        try:
+            self.conn.close()
+        except OSError:
+            pass
+
+    def _request(self, kind, payload, k):
+        with self.lock:
+            if self.broken is not None:
+                raise self.broken
+            try:
+                self.conn.send((kind, payload, k))
+                if not self.conn.poll(self.timeout):
+                    raise TimeoutError(f"Search service did not answer within {self.timeout}s")
+                return self.conn.recv()
+            except Exception as e:
+                if not isinstance(e, (OSError, EOFError)):
+                    e = ConnectionError(f"Search service error: {e!r}")
+                self._break(e)
+                raise e
+
+    def search(self, query_vectors, k):
+        """Same contract as ``faiss_index.search``."""
+        return self._request("vectors", np.asarray(query_vectors, dtype=np.float32), k)
+
+    def search_rows(self, row_ids, k):
+        """Neighbours of catalog rows, looked up by the service from its own vectors."""
+        return self._request("rows", np.asarray(row_ids, dtype=np.int64), k)
+
+
+if __name__ == "__main__":
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    sys.path.insert(0, os.path.dirname(current_dir))
+    from services.movie_engine import MovieEngine
+
+    parser = argparse.ArgumentParser(description="Run the sharded movie vector search service.")
+    parser.add_argument("--address", default=os.environ.get("SEARCH_SERVICE_ADDRESS", DEFAULT_ADDRESS))
+    parser.add_argument("--shards", type=int, default=None)
+    args = parser.parse_args()
+
+    authkey = os.environ.get("SEARCH_SERVICE_AUTHKEY")
+    if not authkey:
+        parser.error("SEARCH_SERVICE_AUTHKEY must be set; refusing to start without an authkey")
+    catalog = MovieEngine.get_catalog()
+    if catalog.index is None:
+        catalog.load_vectors(MovieEngine.catalog_path())
+    SearchServer(catalog, n_shards=args.shards).serve_forever(args.address, authkey)
@@ -37,6 +37,27 @@ class SentimentService:
         prediction = clf.predict(review_vector)[0]
         return "Good" if prediction == 1 else "Bad"
 
+    @classmethod
+    def predict_with_confidence(cls, review_text):
+        """Return the label and a confidence in [0.5, 1] for it.
+
+        Uses predict_proba when the classifier has it. The shipped LinearSVC
+        does not, so its margin m from decision_function is mapped through
+        sigmoid(|m|) = 1 / (1 + exp(-|m|)): 0.5 on the decision boundary, about
+        0.73 at the margin (|m| = 1) and approaching 1 far from it. This is a
+        monotone score, not a calibrated probability.
+        """
+        clf, vectorizer = cls.load_models()
+        review_vector = vectorizer.transform([review_text])
+        prediction = clf.predict(review_vector)[0]
+        if hasattr(clf, "predict_proba"):
+            probabilities = clf.predict_proba(review_vector)[0]
+            confidence = float(probabilities[list(clf.classes_).index(prediction)])
+        else:
+            margin = float(np.abs(clf.decision_function(review_vector)).max())
+            confidence = float(1.0 / (1.0 + np.exp(-margin)))
+        return ("Good" if prediction == 1 else "Bad"), confidence
+
 
 if __name__ == "__main__":
     SentimentService.load_models()
@@ -1,55 +1,77 @@
 import requests
 import os
+import time
+import threading
 import logging
+from collections import OrderedDict
 
 class TMDBService:
     API_KEY = os.environ.get("TMDB_API_KEY")
     BASE_URL = "https://api.themoviedb.org/3"
-    
+    CACHE_TTL = 6 * 60 * 60
+    CACHE_SIZE = 4096
+    REQUEST_TIMEOUT = 5
+    _cache = OrderedDict()
+    _cache_lock = threading.Lock()
+
+    @classmethod
+    def _get(cls, path, **params):
+        """GET a TMDB endpoint, serving repeated calls from an in-process TTL/LRU cache."""
+        key = (path, tuple(sorted(params.items())))
+        now = time.time()
+        with cls._cache_lock:
+            cached = cls._cache.get(key)
+            if cached and now - cached[0] < cls.CACHE_TTL:
+                cls._cache.move_to_end(key)
+                return cached[1]
+
+        response = requests.get(f"{cls.BASE_URL}{path}", params={'api_key': cls.API_KEY, **params},
+                                timeout=cls.REQUEST_TIMEOUT)
+        data = response.json()
+        if response.status_code == 200:
+            with cls._cache_lock:
+                cls._cache[key] = (now, data)
+                cls._cache.move_to_end(key)
+                if len(cls._cache) > cls.CACHE_SIZE:
+                    cls._cache.popitem(last=False)
+        return data
+
     @classmethod
     def search_movie(cls, query):
         try:
-            response = requests.get(
-                f"{cls.BASE_URL}/search/movie",
-                params={'api_key': cls.API_KEY, 'query': query}
-            )
-            return response.json()
+            return cls._get("/search/movie", query=query)
         except Exception as e:
             logging.error(f"TMDB Search Error: {e}")
             return {'error': str(e)}
-    
+
+    @classmethod
+    def find_by_imdb_id(cls, imdb_id):
+        try:
+            return cls._get(f"/find/{imdb_id}", external_source='imdb_id')
+        except Exception as e:
+            logging.error(f"TMDB Find Error: {e}")
+            return {'error': str(e)}
+
     @classmethod
     def get_movie_details(cls, movie_id):
         try:
-            response = requests.get(
-                f"{cls.BASE_URL}/movie/{movie_id}",
-                params={'api_key': cls.API_KEY}
-            )
-            return response.json()
+            return cls._get(f"/movie/{movie_id}")
         except Exception as e:
             logging.error(f"TMDB Movie Details Error: {e}")
             return {'error': str(e)}
-    
+
     @classmethod
     def get_movie_credits(cls, movie_id):
         try:
-            response = requests.get(
-                f"{cls.BASE_URL}/movie/{movie_id}/credits",
-                params={'api_key': cls.API_KEY}
-            )
-            return response.json()
+            return cls._get(f"/movie/{movie_id}/credits")
         except Exception as e:
             logging.error(f"TMDB Credits Error: {e}")
             return {'error': str(e)}
-    
+
     @classmethod
     def get_person_details(cls, person_id):
         try:
-            response = requests.get(
-                f"{cls.BASE_URL}/person/{person_id}",
-                params={'api_key': cls.API_KEY}
-            )
-            return response.json()
+            return cls._get(f"/person/{person_id}")
         except Exception as e:
             logging.error(f"TMDB Person Error: {e}")
-            return {'error': str(e)}
\ No newline at end of file
+            return {'error': str(e)}